@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Data Cleaning Benchmarks
+Generates synthetic mic CSVs at scale from the schema and rows of
+coordinates_new_8_11.csv (with realistic venue/address noise), times each
+normalization/analysis function and records peak memory. Results are
+compared against benchmark_baseline.json and the run fails if any benchmark
+regresses beyond the threshold, or if there is no baseline to compare with.
+
+The committed benchmark_baseline.json was recorded at the default sizes on the
+reference machine (the one that runs this check). Timings are machine
+specific: on other hardware, record a local baseline and pass it with
+--baseline instead of overwriting the committed one.
+
+Usage:
+    python benchmark_cleaning.py                      # 10k and 100k rows
+    python benchmark_cleaning.py --sizes 10000,1000000
+    python benchmark_cleaning.py --update-baseline
+    python benchmark_cleaning.py --baseline my_machine_baseline.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import find_venue_normalization_issues
+import fix_capitalization
+import fix_local_csv
+import fix_venue_normalization
+
+SOURCE_CSV = 'coordinates_new_8_11.csv'
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_THRESHOLD = 1.25
+# Differences below these are timer/allocator/scheduler noise, not regressions.
+# Sub-50ms timings jitter by more than 25% run to run, so the 100k sizes carry the time check
+NOISE_FLOOR = {'seconds': 0.05, 'peak_bytes': 256 * 1024}
+SEED = 20250811
+
+
+def venue_noise(name, rng):
+    """Apply the kinds of inconsistencies seen in the sheet to a venue name"""
+    choice = rng.random()
+    if choice < 0.15:
+        return name.lower()
+    if choice < 0.25:
+        return name.upper()
+    if choice < 0.35:
+        return '  ' + name.replace(' ', '  ') + ' '
+    if choice < 0.45:
+        return name[4:] if name.startswith('The ') else 'The ' + name
+    if choice < 0.55:
+        # "Producer's Club" -> "Producer'S Club"
+        return name.replace("'s", "'S")
+    return name
+
+
+def address_noise(address, rng):
+    """Apply address inconsistencies: case, spacing and a trailing country"""
+    choice = rng.random()
+    if choice < 0.2:
+        return address.lower()
+    if choice < 0.35:
+        return address + ', USA'
+    if choice < 0.45:
+        return address.replace(' ', '  ')
+    return address
+
+
+def generate_dataset(path, rows, source=SOURCE_CSV, seed=SEED):
+    """Write a synthetic CSV with the real schema, streaming so 1M rows fit in memory"""
+    with open(source, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        templates = list(reader)
+        fieldnames = reader.fieldnames
+
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(rng.choice(templates))
+            row['Venue Name'] = venue_noise(row['Venue Name'], rng)
+            row['Location'] = address_noise(row['Location'], rng)
+            if row['unique identifier']:
+                row['unique identifier'] = f"{row['unique identifier']}-{i}"
+            writer.writerow(row)
+
+
+def load_rows(path):
+    """Read only the columns the in-memory benchmarks need"""
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return [
+            {key: row[key] for key in ('Venue Name', 'Location', 'Day', 'Start Time')}
+            for row in csv.DictReader(csvfile)
+        ]
+
+
+def bench_normalize_venue(rows, path):
+    for row in rows:
+        fix_venue_normalization.normalize_venue_name(row['Venue Name'])
+
+
+def bench_normalize_address(rows, path):
+    for row in rows:
+        fix_venue_normalization.normalize_address(row['Location'])
+
+
+def bench_canonical_venue(rows, path):
+    for row in rows:
+        fix_capitalization.normalize_venue_name(row['Venue Name'])
+
+
+def bench_fix_capitalization(rows, path):
+    for row in rows:
+        fix_local_csv.fix_venue_capitalization(row['Venue Name'])
+
+
+def bench_issue_normalize(rows, path):
+    for row in rows:
+        find_venue_normalization_issues.normalize(row['Venue Name'])
+
+
+def bench_analyze_capitalization(rows, path):
+    fix_capitalization.analyze_venue_capitalization(rows)
+
+
+def bench_fix_csv_normalization(rows, path):
+    # The script works on a fixed filename in the current directory
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        shutil.copyfile(path, os.path.join(workdir, SOURCE_CSV))
+        os.chdir(workdir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fix_venue_normalization.fix_csv_normalization()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+
+BENCHMARKS = {
+    'normalize_venue_name': bench_normalize_venue,
+    'normalize_address': bench_normalize_address,
+    'canonical_venue_name': bench_canonical_venue,
+    'fix_venue_capitalization': bench_fix_capitalization,
+    'issues_normalize': bench_issue_normalize,
+    'analyze_venue_capitalization': bench_analyze_capitalization,
+    'fix_csv_normalization': bench_fix_csv_normalization,
+}
+
+
+def measure(func, rows, path, repeat):
+    """Best wall time over `repeat` runs, plus peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows, path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(rows, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(best, 6), 'peak_bytes': peak}
+
+
+def run_benchmarks(sizes, names, repeat):
+    """Run every selected benchmark at every size"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f'mics_{size}.csv')
+            generate_dataset(path, size)
+            rows = load_rows(path)
+            for name in names:
+                key = f'{name}[{size}]'
+                results[key] = measure(BENCHMARKS[name], rows, path, repeat)
+                print(f"  {key:<45} {results[key]['seconds']:>10.4f}s "
+                      f"{results[key]['peak_bytes'] / 1024 / 1024:>9.1f}MB")
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """Benchmarks whose time or peak memory exceeds baseline * threshold"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            previous = baseline[key][metric]
+            current = result[metric]
+            if current > previous * threshold and current - previous > NOISE_FLOOR[metric]:
+                regressions.append((key, metric, previous, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data-cleaning functions")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma separated row counts")
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help="run only the named benchmark (repeatable)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="fail when a metric exceeds baseline * threshold")
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    names = args.only or list(BENCHMARKS)
+
+    # Without a baseline there is nothing to check against, so fail before spending time on the run
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; run with --update-baseline on the reference machine first")
+        sys.exit(1)
+
+    print("=" * 80)
+    print("DATA CLEANING BENCHMARKS")
+    print("=" * 80)
+    results = run_benchmarks(sizes, names, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"✅ Baseline updated in {args.baseline}")
+        return
+
+    missing = [key for key in results if key not in baseline]
+    if len(missing) == len(results):
+        print(f"❌ None of these benchmarks are in {args.baseline}; run with --update-baseline")
+        sys.exit(1)
+    if missing:
+        print(f"⚠️ Not in baseline, not checked: {', '.join(missing)}")
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regressions beyond {args.threshold}x baseline:")
+        for key, metric, previous, current in regressions:
+            print(f"   {key} {metric}: {previous} -> {current}")
+        sys.exit(1)
+    print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
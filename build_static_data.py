@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Static Data Build
+Copies the mic dataset (and any derived artifacts) to static/data/ under
+content-hashed filenames, with gzip and brotli pre-compressed variants, and
+writes data-manifest.json mapping each logical name to its current hashed
+path. Hashed files never change, so they are served with the immutable
+/static/** cache headers; only the tiny manifest is revalidated.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always written
+    brotli = None
+
+DEFAULT_INPUTS = ['coordinates_new_8_11.csv']
+DEFAULT_OUT_DIR = os.path.join('static', 'data')
+DEFAULT_MANIFEST = 'data-manifest.json'
+HASH_LENGTH = 12
+
+
+def content_hash(data):
+    """Short SHA-256 digest used in hashed filenames"""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(path, digest):
+    """coordinates.csv -> coordinates.<digest>.csv"""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return f"{stem}.{digest}{ext}"
+
+
+def write_if_missing(path, data):
+    """Write a file unless an identical hashed artifact is already there"""
+    if os.path.exists(path):
+        return False
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_artifact(src_path, out_dir):
+    """Write the hashed file and its compressed variants, returning its manifest entry"""
+    with open(src_path, 'rb') as f:
+        data = f.read()
+
+    digest = content_hash(data)
+    name = hashed_name(src_path, digest)
+    target = os.path.join(out_dir, name)
+
+    variants = {'identity': (target, data)}
+    # mtime=0 keeps gzip output byte-identical across builds
+    variants['gzip'] = (target + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        variants['br'] = (target + '.br', brotli.compress(data, quality=11))
+
+    written = 0
+    sizes = {}
+    for encoding, (path, payload) in variants.items():
+        written += write_if_missing(path, payload)
+        sizes[encoding] = len(payload)
+
+    entry = {
+        'file': target,
+        'hash': digest,
+        'bytes': sizes,
+    }
+    return entry, written
+
+
+def prune_stale(out_dir, keep):
+    """Remove hashed artifacts no longer referenced by the manifest"""
+    removed = 0
+    for name in os.listdir(out_dir):
+        base = name
+        for suffix in ('.gz', '.br'):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base not in keep:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return removed
+
+
+def load_manifest(path):
+    """The current manifest, or an empty one on the first build"""
+    if not os.path.exists(path):
+        return {'files': {}}
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest.setdefault('files', {})
+    return manifest
+
+
+def build_static_data(inputs, out_dir=DEFAULT_OUT_DIR, manifest_path=DEFAULT_MANIFEST, prune=False):
+    """Build the given artifacts and update their manifest entries. Returns (manifest, files written).
+
+    Entries for artifacts not named in inputs are kept, so publishing one
+    file (e.g. schedule.json) never drops another from the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    # URLs are relative to the hosting root, which is where the manifest lives
+    site_root = os.path.dirname(os.path.abspath(manifest_path))
+
+    manifest = load_manifest(manifest_path)
+    written = 0
+    for src_path in inputs:
+        entry, count = build_artifact(src_path, out_dir)
+        relative = os.path.relpath(os.path.abspath(entry.pop('file')), site_root)
+        entry['path'] = '/' + relative.replace(os.sep, '/')
+        manifest['files'][os.path.basename(src_path)] = entry
+        written += count
+
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    if prune:
+        # Everything the merged manifest references, not just this run's inputs
+        keep = {os.path.basename(entry['path']) for entry in manifest['files'].values()}
+        prune_stale(out_dir, keep)
+
+    return manifest, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write content-hashed, pre-compressed data artifacts")
+    parser.add_argument('inputs', nargs='*', default=DEFAULT_INPUTS)
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR)
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    parser.add_argument('--prune', action='store_true', help="delete artifacts the manifest no longer references")
+    args = parser.parse_args()
+
+    manifest, written = build_static_data(args.inputs, args.out_dir, args.manifest, args.prune)
+    for name in dict.fromkeys(os.path.basename(path) for path in args.inputs):
+        entry = manifest['files'][name]
+        sizes = ', '.join(f"{enc} {size}B" for enc, size in entry['bytes'].items())
+        print(f"📦 {name} -> {entry['path']} ({sizes})")
+    if brotli is None:
+        print("⚠️ brotli not installed, skipped .br variants (pip install brotli)")
+    print(f"✅ Wrote {written} new files, manifest at {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Diff-Aware CSV Rewriter
+Applies a row transform to a CSV while passing untouched rows through
+byte-for-byte: original order, quoting and line endings are kept, and only
+rows whose fields actually changed are re-encoded. When rewriting in place,
+the file is only rewritten from the first changed row onward.
+"""
+
+import csv
+import io
+import os
+
+
+def iter_records(lines):
+    """Group physical lines into raw CSV records (quoted fields may contain newlines)"""
+    pending = []
+    quotes = 0
+    for line in lines:
+        pending.append(line)
+        # Escaped quotes ("") come in pairs, so a record is complete when the count is even
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield ''.join(pending)
+            pending = []
+            quotes = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def split_line_ending(raw):
+    """'a,b\\r\\n' -> ('a,b', '\\r\\n')"""
+    stripped = raw.rstrip('\r\n')
+    return stripped, raw[len(stripped):]
+
+
+def parse_record(raw):
+    return next(csv.reader(io.StringIO(raw)), [])
+
+
+def encode_record(fields, line_ending):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='').writerow(fields)
+    return buffer.getvalue() + line_ending
+
+
+def transform_records(lines, transform):
+    """Yield (raw_record, changed) for every record, header first"""
+    records = iter_records(lines)
+    header_raw = next(records, None)
+    if header_raw is None:
+        return
+    fieldnames = parse_record(header_raw)
+    yield header_raw, False
+
+    for raw in records:
+        body, line_ending = split_line_ending(raw)
+        if not body:
+            yield raw, False
+            continue
+        fields = parse_record(raw)
+        row = dict(zip(fieldnames, fields + [''] * (len(fieldnames) - len(fields))))
+        original = dict(row)
+        transform(row)
+        if row == original:
+            yield raw, False
+        else:
+            # Keep any extra trailing fields the header does not name. The original line
+            # ending is reused as-is, including none on a final line without a newline
+            new_fields = [row.get(name, '') for name in fieldnames] + fields[len(fieldnames):]
+            yield encode_record(new_fields, line_ending), True
+
+
+def rewrite_csv(input_path, transform, output_path=None, encoding='utf-8'):
+    """Apply transform (which mutates a row dict) to every row of a CSV.
+
+    Returns the number of rows that changed. With no output_path (or the same
+    path) the file is patched in place from the first changed row onward, and
+    left untouched when nothing changed.
+    """
+    in_place = output_path is None or os.path.abspath(output_path) == os.path.abspath(input_path)
+    changed = 0
+
+    with open(input_path, newline='', encoding=encoding) as infile:
+        if not in_place:
+            with open(output_path, 'w', newline='', encoding=encoding) as outfile:
+                for raw, was_changed in transform_records(infile, transform):
+                    outfile.write(raw)
+                    changed += was_changed
+            return changed
+
+        prefix_bytes = 0
+        tail = None
+        for raw, was_changed in transform_records(infile, transform):
+            changed += was_changed
+            if tail is None and not was_changed:
+                prefix_bytes += len(raw.encode(encoding))
+            else:
+                if tail is None:
+                    tail = []
+                tail.append(raw)
+
+    if tail:
+        with open(input_path, 'r+b') as outfile:
+            outfile.seek(prefix_bytes)
+            outfile.write(''.join(tail).encode(encoding))
+            outfile.truncate()
+    return changed
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Mic Data API
+Serves filtered mic queries from an indexed in-memory copy of the normalized
+CSV, so phones download only the mics they asked for instead of the whole
+dataset. The CSV is reloaded automatically when the file changes on disk.
+
+    uvicorn data_api:app --port 8001
+    GET /mics?day=Monday&borough=Manhattan&after=7:00 PM&near=40.73,-74.00&radius=2
+
+Requires fastapi and uvicorn.
+"""
+
+import csv
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from itertools import product
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+
+from expand_schedule import parse_minutes
+from fix_venue_normalization import normalize_venue_name
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_CSV = os.environ.get('MIC_DATA_CSV', 'coordinates_new_8_11.csv')
+RELOAD_CHECK_SECONDS = 2.0
+GRID_DEGREES = 0.01  # ~1.1km of latitude per spatial index cell
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Compact response fields: short key -> CSV column
+FIELDS = {
+    'n': 'Open Mic',
+    'v': 'Venue Name',
+    'd': 'Day',
+    't': 'Start Time',
+    'e': 'Latest End Time',
+    'b': 'Borough',
+    'h': 'Neighborhood',
+    'a': 'Location',
+    'c': 'Cost',
+    's': 'Sign-Up Instructions',
+}
+
+
+def parse_time_param(value):
+    """Accept '7:00 PM' or 24-hour '19:00'"""
+    minutes = parse_minutes(value)
+    if minutes is not None:
+        return minutes
+    try:
+        hours, mins = value.split(':')
+        return int(hours) * 60 + int(mins)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid time: {value}")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def grid_cell(lat, lon):
+    return (math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES))
+
+
+class MicStore:
+    """Mic records plus day, borough and spatial grid indexes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.version = None
+        self.records = []
+        self.lock = threading.Lock()
+        self.last_check = 0.0
+        self.load()
+
+    def load(self):
+        """(Re)build the records and indexes from the CSV"""
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        reader = csv.DictReader(raw.decode('utf-8').splitlines())
+
+        records, by_day, by_borough, grid = [], defaultdict(list), defaultdict(list), defaultdict(list)
+        for row in reader:
+            try:
+                lat = float(row.get('Geocodio Latitude', ''))
+                lon = float(row.get('Geocodio Longitude', ''))
+            except ValueError:
+                continue
+            if not (row.get('Venue Name') or '').strip():
+                continue
+
+            record = {key: (row.get(column) or '').strip() for key, column in FIELDS.items()}
+            record['v'] = normalize_venue_name(record['v'])
+            record['lat'] = lat
+            record['lon'] = lon
+            start = parse_minutes(record['t'])
+
+            mic_id = len(records)
+            records.append((record, start))
+            by_day[record['d'].lower()].append(mic_id)
+            by_borough[record['b'].lower()].append(mic_id)
+            grid[grid_cell(lat, lon)].append(mic_id)
+
+        self.records = records
+        self.by_day = dict(by_day)
+        self.by_borough = dict(by_borough)
+        self.grid = dict(grid)
+        self.version = hashlib.sha256(raw).hexdigest()[:16]
+        self.mtime = os.stat(self.path).st_mtime_ns
+        logger.info(f"Loaded {len(records)} mics from {self.path} (version {self.version})")
+
+    def reload_if_changed(self):
+        """Cheap mtime check, at most every RELOAD_CHECK_SECONDS"""
+        now = time.monotonic()
+        if now - self.last_check < RELOAD_CHECK_SECONDS:
+            return
+        with self.lock:
+            self.last_check = now
+            try:
+                if os.stat(self.path).st_mtime_ns != self.mtime:
+                    self.load()
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                # Keep serving the previous data if the file is mid-write or broken
+                logger.warning(f"Reload of {self.path} failed: {e}")
+
+    def nearby(self, lat, lon, radius_km):
+        """Ids within radius_km, found through the grid cells the radius covers"""
+        lat_span = radius_km / 111.0
+        lon_span = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        min_cell = grid_cell(lat - lat_span, lon - lon_span)
+        max_cell = grid_cell(lat + lat_span, lon + lon_span)
+
+        span = (max_cell[0] - min_cell[0] + 1) * (max_cell[1] - min_cell[1] + 1)
+        if span > len(self.grid):
+            # Near the poles the box covers more cells than are occupied, so walk the occupied ones
+            cells = [cell for cell in self.grid if min_cell[0] <= cell[0] <= max_cell[0]]
+        else:
+            cells = product(range(min_cell[0], max_cell[0] + 1), range(min_cell[1], max_cell[1] + 1))
+
+        distances = {}
+        for cell in cells:
+            for mic_id in self.grid.get(cell, ()):
+                record = self.records[mic_id][0]
+                distance = haversine_km(lat, lon, record['lat'], record['lon'])
+                if distance <= radius_km:
+                    distances[mic_id] = distance
+        return distances
+
+    def query(self, day=None, borough=None, after=None, near=None, radius_km=2.0):
+        """Matching records sorted by distance (when near is given) or start time"""
+        candidates = None
+        if day:
+            candidates = set(self.by_day.get(day.lower(), ()))
+        if borough:
+            ids = set(self.by_borough.get(borough.lower(), ()))
+            candidates = ids if candidates is None else candidates & ids
+
+        distances = None
+        if near:
+            distances = self.nearby(near[0], near[1], radius_km)
+            candidates = set(distances) if candidates is None else candidates & set(distances)
+
+        if candidates is None:
+            candidates = range(len(self.records))
+        if after is not None:
+            candidates = [i for i in candidates if self.records[i][1] is not None and self.records[i][1] >= after]
+
+        if distances is not None:
+            ordered = sorted(candidates, key=lambda i: (distances[i], i))
+        else:
+            ordered = sorted(candidates, key=lambda i: (self.records[i][1] is None, self.records[i][1] or 0, i))
+
+        results = []
+        for mic_id in ordered:
+            record = dict(self.records[mic_id][0])
+            if distances is not None:
+                record['km'] = round(distances[mic_id], 2)
+            results.append(record)
+        return results
+
+
+app = FastAPI(title="Mic Data API")
+store = MicStore(DATA_CSV)
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "mics": len(store.records), "version": store.version}
+
+
+@app.get("/mics")
+async def list_mics(
+    request: Request,
+    response: Response,
+    day: str = None,
+    borough: str = None,
+    after: str = None,
+    near: str = Query(None, description="lat,lon"),
+    radius: float = Query(2.0, gt=0, le=50, description="km"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+):
+    """Filtered, paginated mics in compact form"""
+    store.reload_if_changed()
+
+    # The response only depends on the data version and the query, so that is the ETag
+    etag = '"' + hashlib.sha256(f"{store.version}?{request.url.query}".encode('utf-8')).hexdigest()[:20] + '"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+
+    point = None
+    if near:
+        try:
+            lat, lon = (float(part) for part in near.split(','))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="near must be 'lat,lon'")
+        if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+            raise HTTPException(status_code=400, detail="near must be a latitude in [-90, 90] and longitude in [-180, 180]")
+        point = (lat, lon)
+
+    after_minutes = parse_time_param(after) if after else None
+    matches = store.query(day, borough, after_minutes, point, radius)
+
+    start = (page - 1) * limit
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return {
+        'version': store.version,
+        'total': len(matches),
+        'page': page,
+        'next': page + 1 if start + limit < len(matches) else None,
+        'mics': matches[start:start + limit],
+    }
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Schedule Expansion
+Materializes the weekly recurring mics (Day + Start Time rows) into a sorted
+array of dated occurrences for a rolling window, so "happening now",
+"starting soon" and "next mic at this venue" become binary searches instead
+of re-parsing day/time strings for every mic on every call.
+Writes schedule.json, which build_static_data.py can publish.
+"""
+
+import argparse
+import csv
+import json
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from fix_venue_normalization import normalize_venue_name
+
+DEFAULT_CSV = 'coordinates_new_8_11.csv'
+DEFAULT_OUTPUT = 'schedule.json'
+DEFAULT_WINDOW_DAYS = 14
+TIMEZONE = ZoneInfo('America/New_York')
+
+# A mic with no listed end time counts as running for an hour, matching isStarted() in
+# js/utils.js. isHappeningNow() there uses a 30-minute window; happening_now() deliberately
+# uses the longer one so a mic stays listed for its whole likely run.
+DEFAULT_DURATION = 60
+STARTING_SOON_MINUTES = 120
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def parse_minutes(time_str):
+    """'7:30 PM' -> minutes after midnight, or None if the string is not a time"""
+    match = re.match(r'^\s*(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?\s*[Mm]\.?\s*$', time_str or '')
+    if not match:
+        return None
+    hours = int(match.group(1)) % 12
+    minutes = int(match.group(2) or 0)
+    if match.group(3).lower() == 'p':
+        hours += 12
+    return hours * 60 + minutes
+
+
+def epoch_minutes(dt):
+    """Minutes since the Unix epoch for an aware datetime"""
+    return int(dt.timestamp()) // 60
+
+
+def load_mics(csv_path):
+    """Read the rows that have a recognizable day and start time"""
+    mics = []
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            day = (row.get('Day') or '').strip().lower()
+            start = parse_minutes(row.get('Start Time'))
+            if day not in DAYS or start is None:
+                continue
+            end = parse_minutes(row.get('Latest End Time'))
+            if end is None:
+                duration = DEFAULT_DURATION
+            else:
+                # End times after midnight belong to the next day
+                duration = (end - start) % (24 * 60) or DEFAULT_DURATION
+            mics.append({
+                'name': (row.get('Open Mic') or '').strip(),
+                'venue': normalize_venue_name(row.get('Venue Name', '')),
+                'day': DAYS.index(day),
+                'start': start,
+                'duration': duration,
+            })
+    return mics
+
+
+class Schedule:
+    """Occurrences sorted by start time, with per-venue indexes for lookups"""
+
+    def __init__(self, starts, ends, mic_ids, mics):
+        self.starts = starts
+        self.ends = ends
+        self.mic_ids = mic_ids
+        self.mics = mics
+        self.max_duration = max((end - start for start, end in zip(starts, ends)), default=0)
+
+        self.venue_starts = defaultdict(list)
+        self.venue_positions = defaultdict(list)
+        for position, mic_id in enumerate(mic_ids):
+            venue = mics[mic_id]['venue'].lower()
+            self.venue_starts[venue].append(starts[position])
+            self.venue_positions[venue].append(position)
+
+    @classmethod
+    def expand(cls, mics, window_start, days=DEFAULT_WINDOW_DAYS):
+        """Expand weekly mics into occurrences from window_start (aware datetime) for N days.
+
+        The day before window_start is included too, so a mic that started late
+        the previous night and runs past midnight still shows as happening now.
+        """
+        first_day = window_start.astimezone(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+        by_weekday = defaultdict(list)
+        for mic_id, mic in enumerate(mics):
+            by_weekday[mic['day']].append(mic_id)
+
+        occurrences = []
+        for offset in range(-1, days):
+            date = (first_day + timedelta(days=offset)).date()
+            for mic_id in by_weekday[date.weekday()]:
+                mic = mics[mic_id]
+                # Built from the local wall-clock time so DST changes land on the right minute
+                hour, minute = divmod(mic['start'], 60)
+                start = epoch_minutes(datetime(date.year, date.month, date.day, hour, minute, tzinfo=TIMEZONE))
+                occurrences.append((start, start + mic['duration'], mic_id))
+
+        occurrences.sort()
+        return cls([o[0] for o in occurrences], [o[1] for o in occurrences],
+                   [o[2] for o in occurrences], mics)
+
+    def happening_now(self, now):
+        """Positions of occurrences with start <= now < end"""
+        # Only occurrences starting within the longest duration before now can still be running
+        lo = bisect_left(self.starts, now - self.max_duration)
+        hi = bisect_right(self.starts, now)
+        return [i for i in range(lo, hi) if self.ends[i] > now]
+
+    def starting_within(self, now, minutes=STARTING_SOON_MINUTES):
+        """Positions of occurrences starting in (now, now + minutes]"""
+        return list(range(bisect_right(self.starts, now), bisect_right(self.starts, now + minutes)))
+
+    def next_at_venue(self, venue, now):
+        """Position of the next occurrence at a venue starting at or after now, or None"""
+        key = normalize_venue_name(venue).lower()
+        starts = self.venue_starts.get(key, [])
+        index = bisect_left(starts, now)
+        if index == len(starts):
+            return None
+        return self.venue_positions[key][index]
+
+    def to_artifact(self, generated):
+        """Compact columnar form for the browser"""
+        return {
+            'generated': generated,
+            'timezone': str(TIMEZONE),
+            'mics': [{'name': m['name'], 'venue': m['venue']} for m in self.mics],
+            'start': self.starts,
+            'end': self.ends,
+            'mic': self.mic_ids,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expand weekly mics into dated occurrences")
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--days', type=int, default=DEFAULT_WINDOW_DAYS)
+    args = parser.parse_args()
+
+    now = datetime.now(TIMEZONE)
+    schedule = Schedule.expand(load_mics(args.csv), now, args.days)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(schedule.to_artifact(epoch_minutes(now)), f, separators=(',', ':'), ensure_ascii=False)
+
+    current = epoch_minutes(now)
+    print(f"✅ {len(schedule.starts)} occurrences over {args.days} days written to {args.output}")
+    print(f"   {len(schedule.happening_now(current))} happening now, "
+          f"{len(schedule.starting_within(current))} starting within {STARTING_SOON_MINUTES} minutes")
+
+
+if __name__ == "__main__":
+    main()
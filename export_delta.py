@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Delta Export
+Computes a row-level patch (added/removed/modified rows) between the last
+published snapshot of the mic CSV and a new one, and publishes it under an
+incrementing dataset version. Clients holding version N can apply
+data/deltas/v<N>-v<N+1>.json instead of downloading the full CSV again.
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+
+DEFAULT_CSV = 'coordinates_new_8_11.csv'
+DEFAULT_DATA_DIR = 'data'
+KEY_COLUMN = 'unique identifier'
+
+
+def row_keys(rows):
+    """Key each row by its unique identifier, falling back to Day-Start Time-Venue"""
+    keyed = {}
+    for row in rows:
+        key = (row.get(KEY_COLUMN) or '').strip()
+        if not key:
+            key = f"{row.get('Day', '').strip()}-{row.get('Start Time', '').strip()}-{row.get('Venue Name', '').strip()}"
+        # Disambiguate repeated keys by order of appearance
+        base, n = key, 2
+        while key in keyed:
+            key = f"{base}#{n}"
+            n += 1
+        keyed[key] = row
+    return keyed
+
+
+def read_rows(path):
+    """Read a CSV into a list of row dicts"""
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def compute_delta(old_rows, new_rows):
+    """Diff two row lists, returning added rows, removed keys and changed fields"""
+    old = row_keys(old_rows)
+    new = row_keys(new_rows)
+
+    added = {key: row for key, row in new.items() if key not in old}
+    removed = [key for key in old if key not in new]
+    modified = {}
+    for key, row in new.items():
+        if key not in old:
+            continue
+        changes = {field: value for field, value in row.items() if old[key].get(field) != value}
+        if changes:
+            modified[key] = changes
+
+    return {'added': added, 'removed': removed, 'modified': modified}
+
+
+def apply_delta(rows, delta):
+    """Apply a delta to a row list (what a client on the previous version does)"""
+    keyed = row_keys(rows)
+    for key in delta['removed']:
+        keyed.pop(key, None)
+    for key, changes in delta['modified'].items():
+        keyed[key] = {**keyed[key], **changes}
+    keyed.update(delta['added'])
+    return list(keyed.values())
+
+
+def load_version(data_dir):
+    """Load data/version.json, or None before the first export"""
+    path = os.path.join(data_dir, 'version.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(obj, path):
+    """Write JSON compactly and atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def export_delta(csv_path, data_dir=DEFAULT_DATA_DIR):
+    """Publish a new version if the CSV differs from the current snapshot"""
+    os.makedirs(os.path.join(data_dir, 'snapshots'), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'deltas'), exist_ok=True)
+
+    current = load_version(data_dir)
+    new_rows = read_rows(csv_path)
+
+    if current is None:
+        # The first version has no patch; every row counts as added
+        version, patch_path, delta = 1, None, compute_delta([], new_rows)
+    else:
+        delta = compute_delta(read_rows(os.path.join(data_dir, current['snapshot'])), new_rows)
+        if not (delta['added'] or delta['removed'] or delta['modified']):
+            return current, None
+        version = current['version'] + 1
+        patch_path = f"deltas/v{current['version']}-v{version}.json"
+        patch = {'from': current['version'], 'to': version, 'key': KEY_COLUMN, **delta}
+        write_json(patch, os.path.join(data_dir, patch_path))
+
+    # Paths in version.json are relative to the data directory so clients can resolve them
+    snapshot_path = f"snapshots/v{version}.csv"
+    shutil.copyfile(csv_path, os.path.join(data_dir, snapshot_path))
+
+    info = {'version': version, 'rows': len(new_rows), 'snapshot': snapshot_path, 'patch': patch_path}
+    write_json(info, os.path.join(data_dir, 'version.json'))
+
+    # Only the latest snapshot is needed to diff the next version
+    if current is not None and current['snapshot'] != snapshot_path:
+        old_snapshot = os.path.join(data_dir, current['snapshot'])
+        if os.path.exists(old_snapshot):
+            os.remove(old_snapshot)
+
+    return info, delta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a row-level delta between dataset versions")
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    info, delta = export_delta(args.csv, args.data_dir)
+    if delta is None:
+        print(f"✅ No changes, still at version {info['version']}")
+    else:
+        print(f"✅ Published version {info['version']}: {len(delta['added'])} added, "
+              f"{len(delta['removed'])} removed, {len(delta['modified'])} modified")
+
+
+if __name__ == "__main__":
+    main()
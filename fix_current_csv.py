@@ -1,6 +1,6 @@
-import csv
 import re
-from collections import defaultdict
+
+from csv_rewrite import rewrite_csv
 
 def normalize_venue_name(name):
     """Standardize venue name formatting"""
@@ -72,35 +72,22 @@ def fix_csv_normalization():
     input_file = 'coordinates_fixed.csv'
     output_file = 'coordinates_fixed_cleaned.csv'
     
-    # Read all rows and group by normalized venue+address
-    groups = defaultdict(list)
+    # Track unique normalized venue+address combinations
+    groups = set()
     
-    with open(input_file, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        fieldnames = reader.fieldnames or []
-        
-        for row in reader:
-            venue = row.get('Venue Name', '')
-            address = row.get('Location', '')
-            norm_venue = normalize_venue_name(venue)
-            norm_addr = normalize_address(address)
-            key = (norm_venue, norm_addr)
-            groups[key].append(row)
+    def normalize_row(row):
+        norm_venue = normalize_venue_name(row.get('Venue Name', ''))
+        norm_addr = normalize_address(row.get('Location', ''))
+        groups.add((norm_venue, norm_addr))
+        # Update the venue name and address to normalized versions
+        row['Venue Name'] = norm_venue
+        row['Location'] = norm_addr
     
-    # Write fixed CSV with standardized names
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for (norm_venue, norm_addr), rows in groups.items():
-            for row in rows:
-                # Update the venue name and address to normalized versions
-                row['Venue Name'] = norm_venue
-                row['Location'] = norm_addr
-                writer.writerow(row)
+    # Rows keep their original order; only rows that changed are re-encoded
+    changed = rewrite_csv(input_file, normalize_row, output_file)
     
     print(f"Fixed CSV saved as {output_file}")
-    print(f"Processed {len(groups)} unique venue/address combinations")
+    print(f"Processed {len(groups)} unique venue/address combinations ({changed} rows changed)")
 
 if __name__ == "__main__":
     fix_csv_normalization()
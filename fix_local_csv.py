@@ -3,9 +3,10 @@
 Fix capitalization issues in local CSV file
 """
 
-import csv
 import re
 
+from csv_rewrite import rewrite_csv
+
 def fix_venue_capitalization(name):
     """Fix common capitalization issues"""
     if not name:
@@ -33,30 +34,16 @@ def fix_csv():
     """Fix the local CSV file"""
     input_file = 'coordinates_new_8_11.csv'
     
-    # Read the file
-    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        rows = list(reader)
-        fieldnames = reader.fieldnames
-    
-    print(f"Processing {len(rows)} rows...")
-    
-    # Fix venue names
-    fixed_count = 0
-    for row in rows:
+    def fix_row(row):
         original_venue = row.get('Venue Name', '')
         if original_venue:
             fixed_venue = fix_venue_capitalization(original_venue)
             if fixed_venue != original_venue:
                 print(f"Fixed: '{original_venue}' -> '{fixed_venue}'")
                 row['Venue Name'] = fixed_venue
-                fixed_count += 1
     
-    # Write back to the same file
-    with open(input_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    # Only rows that actually changed are rewritten; everything else stays byte-for-byte
+    fixed_count = rewrite_csv(input_file, fix_row)
     
     print(f"\n✅ Fixed {fixed_count} venue names in {input_file}")
 
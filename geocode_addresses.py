@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Batch Geocoding Stage
+Fills the Geocodio columns (coordinates and address parts) of the mic CSV
+from a persistent address -> result cache. Only addresses missing from the
+cache are sent to the geocoder, in bulk batches, so re-running on a mostly
+unchanged sheet makes no geocoding calls at all.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+
+import requests
+
+from csv_rewrite import rewrite_csv
+from fix_venue_normalization import normalize_address
+
+DEFAULT_CSV = 'coordinates_new_8_11.csv'
+DEFAULT_CACHE = 'geocode_cache.json'
+DEFAULT_BATCH_SIZE = 100
+REQUEST_TIMEOUT = 120  # seconds; a 100-address batch normally answers in a few
+
+# CSV columns populated from a geocoding result (the full Geocodio spreadsheet set)
+RESULT_COLUMNS = {
+    'lat': 'Geocodio Latitude',
+    'lon': 'Geocodio Longitude',
+    'accuracy': 'Geocodio Accuracy Score',
+    'accuracy_type': 'Geocodio Accuracy Type',
+    'line1': 'Geocodio Address Line 1',
+    'line2': 'Geocodio Address Line 2',
+    'line3': 'Geocodio Address Line 3',
+    'number': 'Geocodio House Number',
+    'street': 'Geocodio Street',
+    'unit_type': 'Geocodio Unit Type',
+    'unit_number': 'Geocodio Unit Number',
+    'city': 'Geocodio City',
+    'state': 'Geocodio State',
+    'county': 'Geocodio County',
+    'postal_code': 'Geocodio Postal Code',
+    'country': 'Geocodio Country',
+    'source': 'Geocodio Source',
+}
+
+
+def join_parts(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+class GeocodioGeocoder:
+    """Geocodio batch API backend"""
+
+    url = 'https://api.geocod.io/v1.7/geocode'
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.environ.get('GEOCODIO_API_KEY')
+        if not self.api_key:
+            raise ValueError("GEOCODIO_API_KEY is not set")
+
+    def geocode_batch(self, addresses):
+        """Geocode a list of addresses, returning one result (or None) per address"""
+        response = requests.post(self.url, params={'api_key': self.api_key}, json=addresses,
+                                 timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+
+        results = []
+        for item in response.json().get('results', []):
+            matches = item.get('response', {}).get('results', [])
+            if not matches:
+                results.append(None)
+                continue
+            best = matches[0]
+            parts = best.get('address_components', {})
+            street = parts.get('formatted_street', '')
+            city, state, postal_code = parts.get('city', ''), parts.get('state', ''), parts.get('zip', '')
+            results.append({
+                'lat': best['location']['lat'],
+                'lon': best['location']['lng'],
+                'accuracy': best.get('accuracy', ''),
+                'accuracy_type': best.get('accuracy_type', ''),
+                # Same layout as Geocodio's spreadsheet export: "107 Mac Dougal St" / unit / "New York, NY 10012"
+                'line1': join_parts(parts.get('number'), street),
+                'line2': join_parts(parts.get('secondaryunit'), parts.get('secondarynumber')),
+                'line3': join_parts(f"{city}," if city else '', state, postal_code),
+                'number': parts.get('number', ''),
+                'street': street,
+                'unit_type': parts.get('secondaryunit', ''),
+                'unit_number': parts.get('secondarynumber', ''),
+                'city': city,
+                'state': state,
+                'county': parts.get('county', ''),
+                'postal_code': postal_code,
+                'country': parts.get('country', ''),
+                'source': best.get('source', ''),
+            })
+        return results
+
+
+class StubGeocoder:
+    """Offline backend returning deterministic coordinates inside NYC (for tests)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.addresses_sent = 0
+
+    def geocode_batch(self, addresses):
+        self.calls += 1
+        self.addresses_sent += len(addresses)
+
+        results = []
+        for address in addresses:
+            digest = hashlib.sha1(address.encode('utf-8')).digest()
+            result = dict.fromkeys(RESULT_COLUMNS, '')
+            result.update({
+                'lat': round(40.55 + digest[0] / 255 * 0.35, 6),
+                'lon': round(-74.10 + digest[1] / 255 * 0.35, 6),
+                'accuracy': 1,
+                'accuracy_type': 'stub',
+                'line1': address.split(',')[0],
+                'source': 'stub',
+            })
+            results.append(result)
+        return results
+
+
+BACKENDS = {
+    'geocodio': GeocodioGeocoder,
+    'stub': StubGeocoder,
+}
+
+
+def load_cache(path):
+    """Load the address cache, returning an empty one if it does not exist yet"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_cache(cache, path):
+    """Write the cache atomically so an interrupted run cannot corrupt it"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def address_key(row):
+    """Cache key for a row: the normalized Location field"""
+    return normalize_address(row.get('Location', ''))
+
+
+def seed_cache_from_rows(rows, cache):
+    """Add coordinates already present in the CSV to the cache without geocoding"""
+    seeded = 0
+    for row in rows:
+        key = address_key(row)
+        if not key or key in cache:
+            continue
+        try:
+            lat = float(row.get(RESULT_COLUMNS['lat'], ''))
+            lon = float(row.get(RESULT_COLUMNS['lon'], ''))
+        except ValueError:
+            continue
+        cache[key] = {field: row.get(column, '') for field, column in RESULT_COLUMNS.items()}
+        cache[key].update({'lat': lat, 'lon': lon})
+        seeded += 1
+    return seeded
+
+
+def geocode_missing(keys, cache, geocoder, batch_size=DEFAULT_BATCH_SIZE):
+    """Geocode every key not already cached, in batches. Returns the number sent."""
+    misses = sorted({key for key in keys if key and key not in cache})
+    for start in range(0, len(misses), batch_size):
+        batch = misses[start:start + batch_size]
+        results = geocoder.geocode_batch(batch)
+        if len(results) != len(batch):
+            raise ValueError(f"Geocoder returned {len(results)} results for {len(batch)} addresses")
+        # Failed lookups are cached as None so they are not retried every run
+        for key, result in zip(batch, results):
+            cache[key] = result
+    return len(misses)
+
+
+def apply_cache(row, cache):
+    """Write the cached geocoding result (coordinates and address parts) into a row"""
+    result = cache.get(address_key(row))
+    if not result:
+        return
+    moved = any(str(result[field]) != row.get(RESULT_COLUMNS[field], '') for field in ('lat', 'lon'))
+    for field, column in RESULT_COLUMNS.items():
+        if column not in row:
+            continue
+        if field in result:
+            row[column] = str(result[field])
+        elif moved:
+            # Older cache entries only hold coordinates; don't leave the previous address's parts behind
+            row[column] = ''
+
+
+def geocode_csv(csv_path, cache_path, geocoder, batch_size=DEFAULT_BATCH_SIZE, seed=False):
+    """Run the geocode stage over a CSV file, rewriting only rows whose coordinates changed"""
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+
+    cache = load_cache(cache_path)
+    seeded = seed_cache_from_rows(rows, cache) if seed else 0
+    cached_before = len(cache)
+    try:
+        sent = geocode_missing((address_key(row) for row in rows), cache, geocoder, batch_size)
+    finally:
+        # Keep batches that succeeded even if a later one fails
+        if len(cache) != cached_before or seeded:
+            save_cache(cache, cache_path)
+
+    # Rows whose coordinates did not change are left byte-for-byte as they were
+    changed = rewrite_csv(csv_path, lambda row: apply_cache(row, cache))
+
+    return {'rows': len(rows), 'seeded': seeded, 'geocoded': sent, 'changed': changed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill mic coordinates from a persistent geocode cache")
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='geocodio')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', action='store_true',
+                        help="trust coordinates already in the CSV for addresses missing from the cache")
+    args = parser.parse_args()
+
+    try:
+        geocoder = BACKENDS[args.backend]()
+        stats = geocode_csv(args.csv, args.cache, geocoder, args.batch_size, args.seed)
+    except (ValueError, requests.RequestException) as e:
+        print(f"❌ Geocoding failed: {e}")
+        sys.exit(1)
+
+    print(f"✅ {stats['rows']} rows, {stats['seeded']} addresses seeded, "
+          f"{stats['geocoded']} geocoded, {stats['changed']} rows updated")
+
+
+if __name__ == "__main__":
+    main()
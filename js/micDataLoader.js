@@ -33,10 +33,26 @@ function loadMicData(callback) {
 
 // Google Sheets integration removed - using local CSV only
 
+// Resolve the content-hashed CSV path from data-manifest.json (written by build_static_data.py).
+// Hashed files are immutable, so only the small manifest is revalidated on each visit.
+function resolveMicCSVUrl() {
+    return fetch('data-manifest.json', { cache: 'no-cache' })
+        .then(response => (response.ok ? response.json() : null))
+        .then(manifest => {
+            const entry = manifest && manifest.files && manifest.files['coordinates_new_8_11.csv'];
+            return entry ? entry.path : `coordinates_new_8_11.csv?v=${Date.now()}`;
+        })
+        .catch(() => `coordinates_new_8_11.csv?v=${Date.now()}`);
+}
+
 // Load mics from the local CSV file
 function loadMicsFromCSV(callback) {
-    console.log('🚀 [CSV LOADER] Starting to load mic data from coordinates_new_8_11.csv...');
-    Papa.parse(`coordinates_new_8_11.csv?v=${Date.now()}`, {
+    resolveMicCSVUrl().then(url => parseMicsCSV(url, callback));
+}
+
+function parseMicsCSV(url, callback) {
+    console.log('🚀 [CSV LOADER] Starting to load mic data from', url);
+    Papa.parse(url, {
         download: true,
         header: true,
         skipEmptyLines: true,
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Multi-Source Merge
+Merges several mic spreadsheets (local CSVs or published Google Sheets CSV
+URLs) into one dataset at build time, instead of deduplicating in every
+browser. Rows are normalized with the shared venue/address rules and
+hash-joined on (venue, day, start time, rounded coordinates); when sources
+disagree, the row with the most recent 'Last verified' date wins. A Source
+column records where each merged row came from.
+
+Usage:
+    python merge_sources.py -o merged.csv main.csv https://docs.google.com/.../export?format=csv
+"""
+
+import argparse
+import csv
+import re
+import sys
+from datetime import date
+
+import requests
+
+from expand_schedule import parse_minutes
+from fix_venue_normalization import normalize_address, normalize_venue_name
+
+SOURCE_COLUMN = 'Source'
+COORDINATE_PRECISION = 4  # ~11m, tolerates geocoder jitter between sheets
+REQUEST_TIMEOUT = 60  # seconds
+
+
+def read_source(source):
+    """Rows and fieldnames from a CSV path or URL"""
+    if source.startswith(('http://', 'https://')):
+        response = requests.get(source, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        # Decode explicitly: requests falls back to ISO-8859-1 when the
+        # Content-Type has no charset, which mangles accented venue names
+        reader = csv.DictReader(response.content.decode('utf-8-sig').splitlines())
+        return list(reader), reader.fieldnames or []
+    with open(source, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        return list(reader), reader.fieldnames or []
+
+
+def rounded(value):
+    try:
+        return round(float(value), COORDINATE_PRECISION)
+    except (TypeError, ValueError):
+        return None
+
+
+def join_key(row):
+    """Hash-join key: normalized venue, day, start minutes and rounded coordinates"""
+    return (
+        normalize_venue_name(row.get('Venue Name') or '').lower(),
+        (row.get('Day') or '').strip().lower(),
+        parse_minutes(row.get('Start Time')),
+        rounded(row.get('Geocodio Latitude')),
+        rounded(row.get('Geocodio Longitude')),
+    )
+
+
+def verified_date(row, today=None):
+    """'Last verified' text like 'Verified 8/7 SMS' as a date (date.min if missing or invalid).
+
+    Dates without a year are the most recent past occurrence as of today (the
+    build date), so on Jan 10 '12/28' is last December and older than '1/3'.
+    """
+    match = re.search(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?', row.get('Last verified') or '')
+    if not match:
+        return date.min
+    month, day = int(match.group(1)), int(match.group(2))
+    if match.group(3):
+        year = int(match.group(3))
+        if year < 100:
+            year += 2000
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return date.min
+
+    today = today or date.today()
+    # Walk back far enough to reach a leap year for 2/29
+    for year in range(today.year, today.year - 5, -1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        if candidate <= today:
+            return candidate
+    return date.min
+
+
+def merge_sources(sources, today=None):
+    """Merge rows from every source. Returns (rows, fieldnames, stats)."""
+    today = today or date.today()
+    merged = {}
+    provenance = {}
+    fieldnames = []
+    total = 0
+
+    for source in sources:
+        rows, source_fields = read_source(source)
+        for name in source_fields:
+            if name not in fieldnames:
+                fieldnames.append(name)
+
+        for row in rows:
+            if not (row.get('Venue Name') or '').strip():
+                continue
+            total += 1
+            row['Venue Name'] = normalize_venue_name(row['Venue Name'])
+            row['Location'] = normalize_address(row.get('Location') or '')
+
+            key = join_key(row)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = row
+                provenance[key] = [source]
+                continue
+            provenance[key].append(source)
+            # Ties keep the earlier source, so list sources in priority order
+            if verified_date(row, today) > verified_date(current, today):
+                merged[key] = row
+                provenance[key].remove(source)
+                provenance[key].insert(0, source)
+
+    for key, row in merged.items():
+        # Winning source first, then any others that had the same mic
+        row[SOURCE_COLUMN] = '; '.join(dict.fromkeys(provenance[key]))
+
+    # Inputs that are themselves merge outputs already have the column
+    if SOURCE_COLUMN not in fieldnames:
+        fieldnames.append(SOURCE_COLUMN)
+
+    stats = {'sources': len(sources), 'rows_in': total, 'rows_out': len(merged)}
+    return list(merged.values()), fieldnames, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge several mic spreadsheets into one dataset")
+    parser.add_argument('sources', nargs='+', help="CSV paths or URLs, highest priority first")
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args()
+
+    try:
+        rows, fieldnames, stats = merge_sources(args.sources)
+    except (OSError, UnicodeDecodeError, requests.RequestException) as e:
+        print(f"❌ Error reading sources: {e}")
+        sys.exit(1)
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"✅ Merged {stats['rows_in']} rows from {stats['sources']} sources into "
+          f"{stats['rows_out']} mics ({stats['rows_in'] - stats['rows_out']} duplicates) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
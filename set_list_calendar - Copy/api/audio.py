@@ -0,0 +1,40 @@
+import json
+import logging
+import os
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Used when ffprobe cannot read the container: assume a typical 128kbps upload
+FALLBACK_BITRATE = 128_000
+
+
+def probe_duration(path):
+    """Audio duration in seconds from the container header (no decoding)"""
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", path],
+            capture_output=True, check=True, timeout=10,
+        ).stdout
+        return float(json.loads(output)["format"]["duration"])
+    except (OSError, subprocess.SubprocessError, KeyError, ValueError) as e:
+        estimate = os.path.getsize(path) * 8 / FALLBACK_BITRATE
+        logger.warning(f"ffprobe failed for {path} ({e}), estimating {estimate:.0f}s from file size")
+        return estimate
+
+
+def load_audio_segment(path, start=0.0, duration=None):
+    """Decode [start, start + duration) to 16kHz mono float32, like whisper.audio.load_audio"""
+    import numpy as np
+
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-ss", str(start)]
+    if duration is not None:
+        cmd += ["-t", str(duration)]
+    cmd += ["-i", path, "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode(errors='ignore')}") from e
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
@@ -0,0 +1,107 @@
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get("AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "audio_cache"))
+CACHE_MAX_MB = float(os.environ.get("AUDIO_CACHE_MB", "512"))
+
+
+def content_key(data):
+    """Cache key for an upload: the SHA-256 of its bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class AudioCache:
+    """Size-capped on-disk store of decoded PCM and log-mel arrays, keyed by content hash.
+
+    Arrays are saved as .npy files and opened memory-mapped (copy-on-write), so
+    a hit costs page faults rather than an ffmpeg decode or STFT. A file's mtime
+    is bumped on every hit, and the least recently used files are evicted once
+    the directory grows past max_mb.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_mb=CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, kind):
+        return os.path.join(self.directory, f"{key}.{kind}.npy")
+
+    def get(self, key, kind):
+        """Memory-mapped array for (key, kind), or None"""
+        import numpy as np
+
+        path = self._path(key, kind)
+        try:
+            array = np.load(path, mmap_mode="c")
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array
+
+    def put(self, key, kind, array):
+        """Store an array, then evict old entries if over the size cap"""
+        import numpy as np
+
+        path = self._path(key, kind)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Audio cache write failed for {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for path in glob.glob(os.path.join(self.directory, "*.npy")):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    # Open memmaps keep working after unlink on POSIX
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def stats(self):
+        files = 0
+        size = 0
+        for path in glob.glob(os.path.join(self.directory, "*.npy")):
+            try:
+                # A concurrent put() may evict the file between glob and stat
+                size += os.path.getsize(path)
+            except OSError:
+                continue
+            files += 1
+        return {
+            "files": files,
+            "size_mb": round(size / 1024 / 1024, 1),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
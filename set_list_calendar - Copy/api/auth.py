@@ -0,0 +1,50 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Joke indexing/search stores users' material, so it is only enabled when ID
+# tokens can be verified against the app's Firebase project
+FIREBASE_PROJECT_ID = os.environ.get("FIREBASE_PROJECT_ID")
+
+_local = threading.local()
+
+
+class AuthError(Exception):
+    """Missing, malformed or unverifiable credentials"""
+
+
+def is_enabled():
+    return bool(FIREBASE_PROJECT_ID)
+
+
+def _transport():
+    # One session per thread so the Google signing-key fetch reuses its connection
+    if not hasattr(_local, "request"):
+        import requests
+        from google.auth.transport.requests import Request
+        _local.request = Request(requests.Session())
+    return _local.request
+
+
+def verify_bearer(authorization):
+    """Firebase uid from an 'Authorization: Bearer <ID token>' header value.
+
+    Blocking (may fetch Google's signing keys), so call it from a threadpool.
+    """
+    if not is_enabled():
+        raise AuthError("Authentication is not configured")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise AuthError("Missing bearer token")
+
+    from google.oauth2 import id_token
+
+    try:
+        claims = id_token.verify_firebase_token(token, _transport(), audience=FIREBASE_PROJECT_ID)
+    except ValueError as e:
+        raise AuthError(f"Invalid ID token: {e}")
+    if claims.get("iss") != f"https://securetoken.google.com/{FIREBASE_PROJECT_ID}" or not claims.get("sub"):
+        raise AuthError("ID token was not issued for this project")
+    return claims["sub"]
@@ -0,0 +1,172 @@
+"""
+Offline batch transcription.
+
+Transcribes every recording under a directory with the same core as
+/api/transcribe, without HTTP. Files are deduplicated by content hash, run
+largest-first on a process pool with one warm model per worker, and written
+to a JSONL file as they finish. A manifest of finished hashes makes the run
+resumable: re-running the same command skips everything already done.
+
+Usage:
+    python -m api.batch recordings/ -o transcripts.jsonl --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from api import model_loader
+from api.postprocess import extract_segments, split_bits
+from api.transcription import transcribe_file
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.flac', '.ogg', '.webm')
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_recordings(directory):
+    """Audio files under a directory, in a stable order"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def group_by_hash(paths):
+    """{sha256: [paths]} so identical recordings are transcribed once"""
+    groups = {}
+    for path in paths:
+        groups.setdefault(file_hash(path), []).append(path)
+    return groups
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    """Write the manifest atomically so an interrupted run cannot corrupt it"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(model_name, threads):
+    """Load this worker's model once; every job it runs reuses the warm instance"""
+    import torch
+
+    # Split the cores between workers instead of every worker using all of them
+    torch.set_num_threads(threads)
+    model_loader.load_model(model_name)
+
+
+def _transcribe_job(path, model_name, chunk_seconds, options):
+    start = time.time()
+    result = transcribe_file(path, model_name, chunk_seconds, **options)
+    segments = extract_segments(result)
+    return {
+        'transcription': result['text'],
+        'language': result.get('language', 'unknown'),
+        'segments': segments,
+        'bits': split_bits(segments),
+        'seconds': round(time.time() - start, 2),
+    }
+
+
+def run_batch(directory, output_path, manifest_path, model_name=model_loader.MODEL_NAME,
+              workers=1, chunk_seconds=None, options=None):
+    """Transcribe new recordings under directory. Returns counts for the run."""
+    groups = group_by_hash(find_recordings(directory))
+    manifest = load_manifest(manifest_path)
+    pending = {digest: paths for digest, paths in groups.items()
+               if manifest.get(digest, {}).get('status') != 'done'}
+    stats = {'files': sum(len(paths) for paths in groups.values()), 'unique': len(groups),
+             'skipped': len(groups) - len(pending), 'done': 0, 'failed': 0}
+    if not pending:
+        return stats
+
+    # Largest files first, so one long set does not start last and hold up the run
+    order = sorted(pending, key=lambda digest: os.path.getsize(pending[digest][0]), reverse=True)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_name, threads)) as executor, \
+            open(output_path, 'a', encoding='utf-8') as output:
+        futures = {
+            executor.submit(_transcribe_job, pending[digest][0], model_name, chunk_seconds, options or {}): digest
+            for digest in order
+        }
+        for future in as_completed(futures):
+            digest = futures[future]
+            paths = pending[digest]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Failed to transcribe {paths[0]}: {e}")
+                manifest[digest] = {'status': 'failed', 'path': paths[0], 'error': str(e)}
+                stats['failed'] += 1
+            else:
+                record = {'sha256': digest, 'path': paths[0], 'duplicates': paths[1:],
+                          'model': model_name, **result}
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+                manifest[digest] = {'status': 'done', 'path': paths[0]}
+                stats['done'] += 1
+                print(f"✅ {paths[0]} ({result['seconds']}s)")
+            save_manifest(manifest, manifest_path)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a directory of recordings to JSONL")
+    parser.add_argument('directory')
+    parser.add_argument('-o', '--output', default='transcripts.jsonl')
+    parser.add_argument('--manifest', help="defaults to <output>.manifest.json")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--model', default=model_loader.MODEL_NAME)
+    parser.add_argument('--language')
+    parser.add_argument('--chunk-seconds', type=int,
+                        help="decode and transcribe long files in chunks to bound memory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        sys.exit(1)
+
+    manifest_path = args.manifest or os.path.splitext(args.output)[0] + '.manifest.json'
+    options = {'language': args.language} if args.language else {}
+    start = time.time()
+    stats = run_batch(args.directory, args.output, manifest_path, args.model,
+                      max(1, args.workers), args.chunk_seconds, options)
+
+    print(f"📊 {stats['files']} files, {stats['unique']} unique, {stats['skipped']} already done, "
+          f"{stats['done']} transcribed, {stats['failed']} failed in {time.time() - start:.0f}s")
+    print(f"💾 Results: {args.output} (manifest: {manifest_path})")
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from api import model_loader
+from api.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Leave headroom under Render's 512MB plan for the interpreter, ffmpeg and allocator slack
+MEMORY_CEILING_MB = float(os.environ.get("MEMORY_CEILING_MB", "460"))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("MEMORY_QUEUE_TIMEOUT", "300"))
+CHUNK_SECONDS = int(os.environ.get("CHUNK_SECONDS", "300"))
+
+# Approximate resident cost of a model: its weights, plus the encoder/decoder working set
+MODEL_PROFILES = {
+    "tiny.en": {"weights_mb": 75, "working_mb": 60},
+    "tiny": {"weights_mb": 75, "working_mb": 60},
+    "base.en": {"weights_mb": 145, "working_mb": 110},
+    "base": {"weights_mb": 145, "working_mb": 110},
+    "small.en": {"weights_mb": 485, "working_mb": 250},
+    "small": {"weights_mb": 485, "working_mb": 250},
+}
+
+# Downgrade order, largest to smallest
+MODEL_LADDER = ["small.en", "base.en", "tiny.en"]
+
+# Per second of audio: ffmpeg's int16 output (32KB), float32 PCM (64KB) and the log-mel spectrogram (32KB)
+MB_PER_AUDIO_SECOND = (32 + 64 + 32) / 1024
+
+
+class MemoryPressureError(Exception):
+    """Raised when a job could not be admitted within the queue timeout"""
+
+
+@dataclass
+class Decision:
+    action: str  # admit, chunk, downgrade, downgrade+chunk or forced
+    model: str
+    chunk_seconds: Optional[int]
+    estimate_mb: float
+    duration: float
+    waited: float = 0.0
+
+
+class MemoryGovernor:
+    """Admits transcription jobs only while projected memory stays under the ceiling.
+
+    Projected usage is current RSS plus the estimates reserved by running jobs.
+    That double-counts whatever those jobs have already allocated, which errs on
+    the safe side. A job that does not fit is chunked, downgraded to a smaller
+    model, or queued until a running job finishes.
+    """
+
+    def __init__(self, ceiling_mb=MEMORY_CEILING_MB, chunk_seconds=CHUNK_SECONDS,
+                 queue_timeout=QUEUE_TIMEOUT_SECONDS):
+        self.ceiling_mb = ceiling_mb
+        self.chunk_seconds = chunk_seconds
+        self.queue_timeout = queue_timeout
+        self.reserved_mb = 0.0
+        self.in_flight = 0
+        self.queued = 0
+        self.counts = Counter()
+        self.recent = deque(maxlen=20)
+        self._condition = None
+
+    def rss_mb(self):
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+
+    def estimate(self, duration, model, chunk_seconds=None):
+        """Projected peak MB for one job"""
+        profile = MODEL_PROFILES.get(model, MODEL_PROFILES["base.en"])
+        audio_seconds = min(duration, chunk_seconds) if chunk_seconds else duration
+        estimate = profile["working_mb"] + audio_seconds * MB_PER_AUDIO_SECOND
+        # A new instance costs its weights unless they are shared mmap pages already resident
+        needs_instance = model_loader.idle_instances(model) == 0
+        if needs_instance and not (model_loader.has_artifact(model) and model in model_loader.loaded_models()):
+            estimate += profile["weights_mb"]
+        return round(estimate, 1)
+
+    def options(self, duration, preferred):
+        """Candidate (action, model, chunk_seconds) in order of preference"""
+        ladder = [preferred]
+        if preferred in MODEL_LADDER:
+            ladder += MODEL_LADDER[MODEL_LADDER.index(preferred) + 1:]
+        for i, model in enumerate(ladder):
+            prefix = "downgrade" if i else ""
+            yield (prefix or "admit"), model, None
+            if duration > self.chunk_seconds:
+                yield (prefix + "+chunk" if prefix else "chunk"), model, self.chunk_seconds
+
+    def plan(self, duration, preferred):
+        """First option that fits under the ceiling, or None"""
+        headroom = self.ceiling_mb - self.rss_mb() - self.reserved_mb
+        for action, model, chunk_seconds in self.options(duration, preferred):
+            estimate = self.estimate(duration, model, chunk_seconds)
+            if estimate <= headroom:
+                return Decision(action, model, chunk_seconds, estimate, duration)
+        return None
+
+    def cheapest(self, duration, preferred):
+        """Last-resort option when nothing is running that could free memory"""
+        action, model, chunk_seconds = list(self.options(duration, preferred))[-1]
+        return Decision("forced", model, chunk_seconds, self.estimate(duration, model, chunk_seconds), duration)
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def admit(self, duration, preferred=None):
+        """Wait until a job of this duration fits, and reserve its memory while it runs"""
+        preferred = preferred or model_loader.MODEL_NAME
+        condition = self._get_condition()
+        start = time.monotonic()
+
+        async with condition:
+            self.queued += 1
+            try:
+                decision = self.plan(duration, preferred)
+                if decision is None and self.in_flight:
+                    self.counts["queued"] += 1
+                with span("memory_wait"):
+                    while decision is None:
+                        if not self.in_flight:
+                            decision = self.cheapest(duration, preferred)
+                            break
+                        remaining = self.queue_timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            self.counts["rejected"] += 1
+                            raise MemoryPressureError(f"No memory for a {duration:.0f}s job after {self.queue_timeout:.0f}s")
+                        try:
+                            await asyncio.wait_for(condition.wait(), remaining)
+                        except asyncio.TimeoutError:
+                            pass
+                        decision = self.plan(duration, preferred)
+            finally:
+                self.queued -= 1
+
+            decision.waited = round(time.monotonic() - start, 2)
+            self.reserved_mb += decision.estimate_mb
+            self.in_flight += 1
+            self.counts[decision.action] += 1
+            self.recent.append(asdict(decision))
+            logger.info(f"Memory governor: {decision.action} {decision.model} "
+                        f"(~{decision.estimate_mb}MB, waited {decision.waited}s)")
+
+        try:
+            yield decision
+        finally:
+            async with condition:
+                self.reserved_mb -= decision.estimate_mb
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def snapshot(self):
+        """State and recent decisions for /health"""
+        return {
+            "ceiling_mb": self.ceiling_mb,
+            "rss_mb": round(self.rss_mb(), 1),
+            "reserved_mb": round(self.reserved_mb, 1),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "decisions": dict(self.counts),
+            "recent": list(self.recent),
+        }
@@ -0,0 +1,196 @@
+import dataclasses
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from api.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# whisper (and therefore torch) are imported lazily so the app can answer
+# /health before the heavy imports finish.
+MODEL_NAME = os.environ.get("WHISPER_MODEL", "tiny.en")
+MODEL_DIR = os.environ.get(
+    "WHISPER_MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+)
+
+_lock = threading.Lock()
+_pool = defaultdict(list)  # name -> idle model instances
+_instances = Counter()  # name -> instances created and not released
+# Models whose idle instance is kept between jobs; others are freed after each job
+_warm = {MODEL_NAME}
+_status = {
+    "phase": "starting",
+    "imports_ready": False,
+    "import_seconds": None,
+    "error": None,
+}
+
+
+def artifact_path(name=MODEL_NAME):
+    """Location of the pre-serialized model produced at build time"""
+    return os.path.join(MODEL_DIR, f"{name}.pt")
+
+
+def build_artifact(name=MODEL_NAME):
+    """Download a Whisper model and save it in a zip-format checkpoint that torch can mmap"""
+    import torch
+    import whisper
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    model = whisper.load_model(name, device="cpu")
+    path = artifact_path(name)
+    torch.save({"dims": dataclasses.asdict(model.dims), "model_state_dict": model.state_dict()}, path)
+    logger.info(f"DEPLOYMENT: Wrote model artifact {path}")
+    return path
+
+
+def _load_from_artifact(name, path):
+    import torch
+    import whisper
+    from whisper.model import AudioEncoder, ModelDimensions, TextDecoder, Whisper
+
+    # mmap=True maps the weights from the file instead of reading them into
+    # anonymous memory; assign=True keeps those mapped tensors in the model.
+    checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    dims = ModelDimensions(**checkpoint["dims"])
+
+    # Same layout as Whisper.__init__, but the encoder/decoder are built on the meta
+    # device so no randomly initialised weights are allocated before the mapped ones
+    # are assigned. (Whisper(dims) itself cannot run on meta: it calls to_sparse.)
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer
+        )
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer
+        )
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+
+    # Non-persistent buffers are not in the checkpoint; rebuild them as Whisper.__init__ does
+    mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(float("-inf")).triu_(1)
+    model.decoder.register_buffer("mask", mask, persistent=False)
+    all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    all_heads[dims.n_text_layer // 2:] = True
+    model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+    alignment_heads = getattr(whisper, "_ALIGNMENT_HEADS", {}).get(name)
+    if alignment_heads:
+        model.set_alignment_heads(alignment_heads)
+
+    missing = [key for key, tensor in [*model.named_parameters(), *model.named_buffers()] if tensor.is_meta]
+    if missing:
+        raise RuntimeError(f"Model artifact {path} did not provide {', '.join(missing)}")
+    return model.eval()
+
+
+def _create_model(name):
+    logger.info(f"DEPLOYMENT: Loading Whisper model ({name})...")
+    start_time = time.time()
+    path = artifact_path(name)
+    if os.path.exists(path):
+        model = _load_from_artifact(name, path)
+    else:
+        # No build artifact (e.g. local dev): fall back to Whisper's own loader
+        import whisper
+        logger.warning(f"DEPLOYMENT: Model artifact {path} missing, using whisper.load_model")
+        model = whisper.load_model(name, device="cpu")
+    logger.info(f"DEPLOYMENT: Whisper model loaded in {time.time() - start_time:.2f}s")
+    return model
+
+
+def load_model(name=MODEL_NAME):
+    """Make sure at least one warm instance of a model is pooled, and keep it warm"""
+    with _lock:
+        _warm.add(name)
+        if _instances[name]:
+            return
+        _pool[name].append(_create_model(name))
+        _instances[name] += 1
+
+
+@contextmanager
+def acquire_model(name=MODEL_NAME):
+    """Borrow a model instance for one transcription.
+
+    Whisper installs kv-cache hooks on the model while decoding, so an instance
+    cannot serve two jobs at once. Concurrent jobs get their own instance;
+    instances loaded from the artifact share the same mmap'd weight pages.
+    """
+    with span("model_acquire"):
+        with _lock:
+            model = _pool[name].pop() if _pool[name] else None
+        if model is None:
+            model = _create_model(name)
+            with _lock:
+                _instances[name] += 1
+    try:
+        yield model
+    finally:
+        with _lock:
+            # Keep one idle instance of each warm model. Extra instances from bursts, and
+            # models a single request asked for, are dropped so their weights are freed
+            if name in _warm and not _pool[name]:
+                _pool[name].append(model)
+            else:
+                _instances[name] -= 1
+
+
+def loaded_models():
+    return [name for name, count in _instances.items() if count]
+
+
+def idle_instances(name=MODEL_NAME):
+    return len(_pool[name])
+
+
+def has_artifact(name=MODEL_NAME):
+    return os.path.exists(artifact_path(name))
+
+
+def _warm_up(preload):
+    try:
+        start_time = time.time()
+        import whisper  # noqa: F401  (pulls in torch)
+        _status["import_seconds"] = round(time.time() - start_time, 2)
+        _status["imports_ready"] = True
+        logger.info(f"DEPLOYMENT: Heavy imports ready in {_status['import_seconds']}s")
+        if preload:
+            _status["phase"] = "loading_model"
+            load_model()
+        _status["phase"] = "ready"
+    except Exception as e:
+        _status["phase"] = "failed"
+        _status["error"] = str(e)
+        logger.error(f"DEPLOYMENT: Warm-up failed: {e}")
+
+
+def start_warm_up(preload=None):
+    """Import whisper/torch (and optionally load the model) in the background"""
+    if preload is None:
+        preload = os.environ.get("WHISPER_PRELOAD", "1") == "1"
+    _status["phase"] = "importing"
+    threading.Thread(target=_warm_up, args=(preload,), name="model-warm-up", daemon=True).start()
+
+
+def status():
+    return {
+        **_status,
+        "model": MODEL_NAME,
+        "artifact": has_artifact(),
+        "loaded_models": loaded_models(),
+    }
+
+
+def is_ready():
+    return _status["phase"] == "ready"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_artifact()
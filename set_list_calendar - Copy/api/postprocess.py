@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# A silence at least this long between segments starts a new bit
+PAUSE_THRESHOLD_SECONDS = float(os.environ.get("BIT_PAUSE_SECONDS", "2.0"))
+
+# Whisper transcribes audience reactions as bracketed or parenthesized notes
+LAUGHTER_PATTERN = re.compile(
+    r"^\W*[\[(]?\s*(laughter|laughing|laughs|laugh|applause|audience laughs|cheering)\s*[\])]?\W*$",
+    re.IGNORECASE,
+)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "i", "if", "in", "is", "it",
+    "its", "it's", "i'm", "me", "my", "of", "on", "or", "so", "that", "the", "this", "to", "was",
+    "we", "you", "your", "just", "like", "um", "uh", "yeah", "oh",
+}
+
+# Fraction of a query's terms a bit must contain to count as the same bit
+MATCH_THRESHOLD = 0.5
+
+
+def extract_segments(result):
+    """Reduce a Whisper result to timestamped text segments"""
+    return [
+        {
+            "start": round(float(segment["start"]), 2),
+            "end": round(float(segment["end"]), 2),
+            "text": segment["text"].strip(),
+        }
+        for segment in result.get("segments", [])
+        if segment.get("text", "").strip()
+    ]
+
+
+def is_laughter(text):
+    return bool(LAUGHTER_PATTERN.match(text))
+
+
+def split_bits(segments, pause_threshold=PAUSE_THRESHOLD_SECONDS):
+    """Group segments into bits, splitting on long pauses and laughter"""
+    bits = []
+    current = []
+    last_end = None
+
+    for segment in segments:
+        if is_laughter(segment["text"]):
+            # A laugh closes the bit; its duration counts as part of the gap
+            if current:
+                bits.append(current)
+                current = []
+            last_end = segment["end"]
+            continue
+        if current and last_end is not None and segment["start"] - last_end >= pause_threshold:
+            bits.append(current)
+            current = []
+        current.append(segment)
+        last_end = segment["end"]
+
+    if current:
+        bits.append(current)
+
+    return [
+        {
+            "start": bit[0]["start"],
+            "end": bit[-1]["end"],
+            "text": " ".join(segment["text"] for segment in bit),
+        }
+        for bit in bits
+    ]
+
+
+def tokenize(text):
+    """Lowercase content words used as index terms"""
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    return [word for word in words if word not in STOPWORDS and len(word) > 1]
+
+
+class JokeIndex:
+    """Per-user inverted index from terms to (set, bit) postings, persisted as JSON"""
+
+    def __init__(self, directory=None, cache_users=None):
+        self.directory = directory or os.environ.get(
+            "JOKE_INDEX_DIR", os.path.join(tempfile.gettempdir(), "joke_index")
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        # Recently used indexes stay parsed; the rest are re-read from their (small) files
+        self.cache_users = cache_users if cache_users is not None else int(
+            os.environ.get("JOKE_INDEX_CACHE_USERS", "16")
+        )
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def is_valid_user_id(user_id):
+        """User ids (Firebase uids) become filenames, so only [A-Za-z0-9_-] ids are accepted"""
+        return bool(re.fullmatch(r"[A-Za-z0-9_-]{1,128}", user_id or ""))
+
+    def _path(self, user_id):
+        if not self.is_valid_user_id(user_id):
+            raise ValueError("Invalid user id")
+        return os.path.join(self.directory, f"{user_id}.json")
+
+    def _load(self, user_id):
+        data = self._cache.get(user_id)
+        if data is None:
+            path = self._path(user_id)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            else:
+                data = {"sets": {}, "postings": {}}
+        # LRU: bounded so indexes do not pile up in the memory the governor budgets for jobs
+        self._cache[user_id] = data
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_users:
+            self._cache.popitem(last=False)
+        return data
+
+    def _save(self, user_id, data):
+        path = self._path(user_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def add_set(self, user_id, filename, bits):
+        """Index a transcribed set's bits and return its set id"""
+        set_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            data = self._load(user_id)
+            data["sets"][set_id] = {"filename": filename, "created": int(time.time()), "bits": bits}
+            for bit_index, bit in enumerate(bits):
+                for term in set(tokenize(bit["text"])):
+                    data["postings"].setdefault(term, []).append([set_id, bit_index])
+            self._save(user_id, data)
+        logger.info(f"Indexed set {set_id} with {len(bits)} bits for user {user_id}")
+        return set_id
+
+    def search(self, user_id, query, threshold=MATCH_THRESHOLD):
+        """Sets containing a bit that shares enough terms with the query, best match first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            data = self._load(user_id)
+            hits = defaultdict(int)
+            for term in terms:
+                for set_id, bit_index in data["postings"].get(term, ()):
+                    hits[(set_id, bit_index)] += 1
+
+            best = {}
+            for (set_id, bit_index), count in hits.items():
+                score = count / len(terms)
+                if score >= threshold and score > best.get(set_id, (0, None))[0]:
+                    best[set_id] = (score, bit_index)
+
+            matches = []
+            for set_id, (score, bit_index) in best.items():
+                entry = data["sets"][set_id]
+                matches.append({
+                    "set_id": set_id,
+                    "filename": entry["filename"],
+                    "created": entry["created"],
+                    "score": round(score, 2),
+                    "bit": entry["bits"][bit_index],
+                })
+        return sorted(matches, key=lambda match: (-match["score"], -match["created"]))
@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from api.tracing import span
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", "2"))
+# Jobs at or under this many seconds of audio go in the short lane
+SHORT_JOB_SECONDS = float(os.environ.get("SHORT_JOB_SECONDS", "600"))
+# Workers long jobs may never occupy, so a short job never waits behind long ones
+RESERVED_SHORT_WORKERS = int(os.environ.get("RESERVED_SHORT_WORKERS", "1"))
+# Seconds of priority a queued job gains per second of waiting, so long jobs cannot starve
+AGING_RATE = float(os.environ.get("SCHEDULER_AGING_RATE", "10"))
+
+LANES = ("short", "long")
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+
+
+class LaneStats:
+    """Rolling queue-wait and end-to-end latency for one lane"""
+
+    def __init__(self, size=200):
+        self.waits = deque(maxlen=size)
+        self.latencies = deque(maxlen=size)
+        self.completed = 0
+
+    def snapshot(self):
+        return {
+            "completed": self.completed,
+            "wait_p50": percentile(self.waits, 0.5),
+            "wait_p95": percentile(self.waits, 0.95),
+            "latency_p50": percentile(self.latencies, 0.5),
+            "latency_p95": percentile(self.latencies, 0.95),
+        }
+
+
+class JobScheduler:
+    """Shortest-job-first dispatch with aging, split into short and long lanes.
+
+    A job's priority key is its audio duration plus AGING_RATE times its enqueue
+    time. Because every queued job ages at the same rate, that fixed key orders
+    jobs exactly like "duration minus time waited", so plain heaps work.
+    Long jobs are capped at MAX_WORKERS - RESERVED_SHORT_WORKERS running at once.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, short_seconds=SHORT_JOB_SECONDS,
+                 reserved_short=RESERVED_SHORT_WORKERS, aging_rate=AGING_RATE):
+        self.max_workers = max(1, max_workers)
+        self.short_seconds = short_seconds
+        self.long_limit = max(1, self.max_workers - reserved_short)
+        self.aging_rate = aging_rate
+        self.queues = {lane: [] for lane in LANES}
+        self.running = {lane: 0 for lane in LANES}
+        self.stats = {lane: LaneStats() for lane in LANES}
+        self._counter = itertools.count()
+
+    def lane_for(self, duration):
+        return "short" if duration <= self.short_seconds else "long"
+
+    def _pending(self, lane):
+        """Drop abandoned entries (client went away) from the head of a lane"""
+        queue = self.queues[lane]
+        while queue and queue[0][2].done():
+            heapq.heappop(queue)
+        return queue
+
+    def _dispatch(self):
+        while sum(self.running.values()) < self.max_workers:
+            candidates = []
+            short_queue = self._pending("short")
+            if short_queue:
+                candidates.append((short_queue[0][0], "short"))
+            long_queue = self._pending("long")
+            if long_queue and self.running["long"] < self.long_limit:
+                candidates.append((long_queue[0][0], "long"))
+            if not candidates:
+                return
+            _, lane = min(candidates)
+            _, _, future = heapq.heappop(self.queues[lane])
+            self.running[lane] += 1
+            future.set_result(lane)
+
+    @asynccontextmanager
+    async def slot(self, duration):
+        """Wait for a worker slot in the job's lane and hold it while the job runs"""
+        lane = self.lane_for(duration)
+        enqueued = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        key = duration + self.aging_rate * enqueued
+        heapq.heappush(self.queues[lane], (key, next(self._counter), future))
+        self._dispatch()
+
+        try:
+            with span("queue"):
+                await future
+        except asyncio.CancelledError:
+            # If the slot was granted just as we were cancelled, hand it back
+            if future.done() and not future.cancelled():
+                self.running[lane] -= 1
+                self._dispatch()
+            raise
+
+        started = time.monotonic()
+        self.stats[lane].waits.append(started - enqueued)
+        logger.info(f"Scheduler: {lane} job ({duration:.0f}s audio) started after {started - enqueued:.2f}s")
+        try:
+            yield lane
+        finally:
+            self.running[lane] -= 1
+            self.stats[lane].latencies.append(time.monotonic() - enqueued)
+            self.stats[lane].completed += 1
+            self._dispatch()
+
+    def snapshot(self):
+        """Per-lane queue depth, running jobs and latency percentiles"""
+        return {
+            "max_workers": self.max_workers,
+            "short_job_seconds": self.short_seconds,
+            "long_worker_limit": self.long_limit,
+            "lanes": {
+                lane: {
+                    "queued": len([entry for entry in self.queues[lane] if not entry[2].done()]),
+                    "running": self.running[lane],
+                    **self.stats[lane].snapshot(),
+                }
+                for lane in LANES
+            },
+        }
@@ -0,0 +1,144 @@
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# How many of the slowest request timelines to keep for /debug/traces
+SLOW_TRACE_COUNT = int(os.environ.get("SLOW_TRACE_COUNT", "20"))
+# ...chosen from this many most recent requests, so one cold start does not pin the list forever
+SLOW_TRACE_WINDOW = int(os.environ.get("SLOW_TRACE_WINDOW", "1000"))
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    """Span timeline for one request.
+
+    Starlette copies the context into run_in_threadpool, so spans opened in
+    worker threads land on the same trace as the request that started them.
+    """
+
+    def __init__(self, request_id, method, path):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.status = None
+        self.spans = []  # (name, offset_ms, duration_ms)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def finish(self, status):
+        self.status = status
+        self.duration = self.elapsed_ms()
+
+    def totals(self):
+        """Total milliseconds per span name (chunked jobs repeat decode/transcribe)"""
+        totals = defaultdict(float)
+        for name, _, duration in self.spans:
+            totals[name] += duration
+        return totals
+
+    def server_timing(self):
+        parts = [f"{name};dur={duration:.1f}" for name, duration in self.totals().items()]
+        parts.append(f"total;dur={self.duration or self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": round(self.duration or 0, 1),
+            "spans": [
+                {"name": name, "offset_ms": round(offset, 1), "duration_ms": round(duration, 1)}
+                for name, offset, duration in self.spans
+            ],
+        }
+
+
+def current_request_id():
+    trace = _current.get()
+    return trace.request_id if trace else "-"
+
+
+@contextmanager
+def span(name):
+    """Time a block as a span of the current request (a no-op outside a request)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = trace.elapsed_ms()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, start, trace.elapsed_ms() - start))
+
+
+class SlowTraceSampler:
+    """Keeps the slowest N request timelines among the last `window` requests.
+
+    Recent traces sit in a bounded deque, so old outliers age out instead of
+    hiding every later regression; to_dict() only runs for the ones returned.
+    """
+
+    def __init__(self, size=SLOW_TRACE_COUNT, window=SLOW_TRACE_WINDOW):
+        self.size = size
+        self._recent = deque(maxlen=max(size, window))
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, trace):
+        with self._lock:
+            self._recent.append((trace.duration, next(self._counter), trace))
+
+    def slowest(self):
+        with self._lock:
+            entries = heapq.nlargest(self.size, self._recent)
+        return [trace.to_dict() for _, _, trace in entries]
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds %(request_id)s to log records so lines from one request can be grouped"""
+
+    def filter(self, record):
+        record.request_id = current_request_id()
+        return True
+
+
+def install(app, sampler):
+    """Register the tracing middleware on a FastAPI app"""
+
+    @app.middleware("http")
+    async def trace_requests(request, call_next):
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+        trace = Trace(request_id, request.method, request.url.path)
+        token = _current.set(trace)
+        try:
+            response = await call_next(request)
+        except Exception:
+            trace.finish(500)
+            sampler.record(trace)
+            raise
+        finally:
+            _current.reset(token)
+
+        trace.finish(response.status_code)
+        sampler.record(trace)
+        response.headers["X-Request-ID"] = request_id
+        response.headers["Server-Timing"] = trace.server_timing()
+        return response
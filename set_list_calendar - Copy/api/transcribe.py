@@ -1,21 +1,30 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-import whisper
+from fastapi.responses import HTMLResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 import tempfile
 import os
 import logging
 import sys
-import time
 import asyncio
 import gc
-import psutil
+
+from api import auth, model_loader, tracing
+from api.audio import probe_duration
+from api.audio_cache import AudioCache, content_key
+from api.memory_governor import MODEL_PROFILES, MemoryGovernor, MemoryPressureError
+from api.postprocess import JokeIndex, extract_segments, split_bits
+from api.scheduler import JobScheduler
+from api.tracing import RequestIdFilter, SlowTraceSampler, span
+from api.transcription import transcribe_file
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
 )
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -36,25 +45,50 @@ app.add_middleware(
 )
 logger.info("DEPLOYMENT: CORS middleware added successfully")
 
-# Memory-optimized approach: Load model per request for Render's 512MB limit
+# Request ids, span timelines and Server-Timing headers
+slow_traces = SlowTraceSampler()
+tracing.install(app, slow_traces)
+
+joke_index = JokeIndex()
+memory_governor = MemoryGovernor()
+scheduler = JobScheduler()
+# Decoded PCM and log-mel features per upload hash, so retries skip ffmpeg
+audio_cache = AudioCache()
+
+# Heavy imports (whisper/torch) happen in a background warm-up so /health answers immediately
+@app.on_event("startup")
+async def start_warm_up():
+    model_loader.start_warm_up()
+
+def memory_usage_mb():
+    """Current RSS in MB (psutil is imported lazily to keep startup fast)"""
+    import psutil
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+# The model is memory-mapped from a build-time artifact, so keeping it warm is cheap
 def load_model_for_transcription():
-    """Load model just-in-time to minimize memory usage"""
+    """Make sure the warm Whisper model is loaded"""
     try:
-        logger.info("DEPLOYMENT: Loading Whisper model (tiny.en for memory optimization)...")
-        start_time = time.time()
-        
-        # Use smallest English-only model for Render's 512MB memory limit
-        model = whisper.load_model("tiny.en")
-        
-        load_time = time.time() - start_time
-        logger.info(f"DEPLOYMENT: Whisper model loaded in {load_time:.2f}s")
-        
-        return model
-        
+        model_loader.load_model()
     except Exception as e:
         logger.error(f"DEPLOYMENT: Failed to load Whisper model: {e}")
         raise Exception(f"Failed to load transcription model: {e}")
 
+async def authenticated_user(authorization):
+    """Verified Firebase uid that owns a joke index, or the matching HTTP error"""
+    if not auth.is_enabled():
+        raise HTTPException(status_code=501, detail="Joke indexing is not enabled on this server")
+    try:
+        user_id = await run_in_threadpool(auth.verify_bearer, authorization)
+    except auth.AuthError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    except Exception as e:
+        logger.error(f"Token verification unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Could not verify credentials. Please try again.")
+    if not joke_index.is_valid_user_id(user_id):
+        raise HTTPException(status_code=400, detail="Unsupported user id")
+    return user_id
+
 # Serve static files
 @app.get("/")
 async def root():
@@ -207,12 +241,24 @@ async def api_status():
     return {"message": "Comedy Transcription API", "status": "running"}
 
 @app.post("/api/transcribe")
-async def transcribe_audio(file: UploadFile = File(...)):
+async def transcribe_audio(
+    file: UploadFile = File(...),
+    language: str = Form(None),
+    model: str = Form(None),
+    authorization: str = Header(None)
+):
     logger.info("Transcribe endpoint accessed")
     if not file:
         logger.error("No file uploaded")
         raise HTTPException(status_code=400, detail="No file uploaded")
     
+    # Signed-in callers get the set indexed under their verified uid. Checked up
+    # front so a bad token does not cost a whole transcription before the 401
+    user_id = await authenticated_user(authorization) if authorization else None
+    
+    if model and model not in MODEL_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown model. Choose one of: {', '.join(MODEL_PROFILES)}")
+    
     # Check file type
     if not file.content_type or not file.content_type.startswith('audio/'):
         # Allow common audio extensions even if content_type is wrong
@@ -227,9 +273,8 @@ async def transcribe_audio(file: UploadFile = File(...)):
     try:
         logger.info(f"Processing file: {file.filename}")
         
-        # Load model just-in-time to minimize memory usage
         try:
-            whisper_model = load_model_for_transcription()
+            await run_in_threadpool(load_model_for_transcription)
         except Exception as model_error:
             logger.error(f"Model loading failed: {model_error}")
             raise HTTPException(
@@ -237,34 +282,50 @@ async def transcribe_audio(file: UploadFile = File(...)):
                 detail="Transcription service temporarily unavailable. Please try again in a few minutes."
             )
         
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
+        with span("upload_read"):
             content = await file.read()
-            if not content:
-                raise HTTPException(status_code=400, detail="File is empty")
-            
-            tmp.write(content)
-            temp_path = tmp.name
+        if not content:
+            raise HTTPException(status_code=400, detail="File is empty")
+        
+        # Save uploaded file to temporary location
+        with span("tempfile_write"):
+            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
+                tmp.write(content)
+                temp_path = tmp.name
+        cache_key = content_key(content)
+        del content
         
-        logger.info(f"File saved to {temp_path}, starting transcription...")
+        with span("probe"):
+            duration = await run_in_threadpool(probe_duration, temp_path)
+        logger.info(f"File saved to {temp_path} ({duration:.0f}s of audio), waiting for a worker...")
         
         # Transcribe the audio file with timeout and memory management
         try:
-            # Log memory usage before transcription
-            memory_mb = psutil.Process().memory_info().rss / 1024 / 1024
-            logger.info(f"Memory usage before transcription: {memory_mb:.1f}MB")
-            
-            # Set a reasonable timeout for transcription
-            result = whisper_model.transcribe(temp_path)
-            logger.info("Transcription completed successfully")
-            
-            # Immediately free model memory after transcription
-            del whisper_model
-            gc.collect()
+            # Short clips are scheduled ahead of long recordings; the governor then
+            # picks model/chunking so projected memory stays under the ceiling
+            async with scheduler.slot(duration), memory_governor.admit(duration, model) as decision:
+                logger.info(f"Memory usage before transcription: {memory_usage_mb():.1f}MB")
+                
+                # Run off the event loop so /health stays responsive and jobs can overlap
+                options = {"language": language} if language else {}
+                result = await run_in_threadpool(
+                    transcribe_file, temp_path, decision.model, decision.chunk_seconds,
+                    audio_cache, cache_key, **options
+                )
+                logger.info("Transcription completed successfully")
+                
+                # Free intermediate tensors; the model itself stays warm
+                with span("cleanup"):
+                    gc.collect()
             
-            memory_mb = psutil.Process().memory_info().rss / 1024 / 1024
-            logger.info(f"Memory usage after cleanup: {memory_mb:.1f}MB")
+            logger.info(f"Memory usage after cleanup: {memory_usage_mb():.1f}MB")
             
+        except MemoryPressureError as pressure_error:
+            logger.error(f"Transcription not admitted: {pressure_error}")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy with other transcriptions. Please try again in a few minutes."
+            )
         except Exception as transcribe_error:
             logger.error(f"Whisper transcription failed: {transcribe_error}")
             # Clean up memory on error
@@ -274,10 +335,22 @@ async def transcribe_audio(file: UploadFile = File(...)):
                 detail=f"Audio processing failed. Please try with a shorter audio file or different format."
             )
         
+        segments = extract_segments(result)
+        bits = split_bits(segments)
+
+        set_id = None
+        if user_id:
+            # Rewrites the user's index file, so keep it off the event loop
+            set_id = await run_in_threadpool(joke_index.add_set, user_id, file.filename, bits)
+        
         return {
             "filename": file.filename,
             "transcription": result["text"],
             "language": result.get("language", "unknown"),
+            "model": decision.model,
+            "segments": segments,
+            "bits": bits,
+            "set_id": set_id,
             "success": True
         }
         
@@ -292,33 +365,53 @@ async def transcribe_audio(file: UploadFile = File(...)):
         # Clean up temporary file
         if temp_path and os.path.exists(temp_path):
             try:
-                os.remove(temp_path)
+                with span("cleanup"):
+                    os.remove(temp_path)
                 logger.info(f"Cleaned up temporary file: {temp_path}")
             except Exception as e:
                 logger.warning(f"Failed to clean up temp file {temp_path}: {e}")
 
+@app.get("/api/jokes/search")
+async def search_jokes(q: str, authorization: str = Header(None)):
+    """Find the past sets in which the signed-in user performed a bit"""
+    user_id = await authenticated_user(authorization)
+    matches = await run_in_threadpool(joke_index.search, user_id, q)
+    return {"query": q, "matches": matches}
+
 @app.get("/health")
 async def health_check():
     logger.info("Health check accessed")
     return {
         "status": "healthy",
         "memory_optimized": True,
-        "model_type": "tiny.en (load-per-request)"
+        "model_type": f"{model_loader.MODEL_NAME} (mmap artifact)",
+        "startup": model_loader.status(),
+        "memory": memory_governor.snapshot(),
+        "scheduler": scheduler.snapshot(),
+        "audio_cache": audio_cache.stats()
     }
 
+@app.get("/debug/traces")
+async def debug_traces():
+    """Span timelines of the slowest of the last SLOW_TRACE_WINDOW requests, slowest first"""
+    return {"traces": slow_traces.slowest()}
+
+@app.get("/ready")
+async def readiness_check():
+    """200 once inference is available, 503 while warming up"""
+    status = model_loader.status()
+    return JSONResponse(status_code=200 if model_loader.is_ready() else 503, content=status)
+
 @app.post("/api/preload-model")
 async def preload_model():
-    """Test model loading (no persistent preload in memory-optimized mode)"""
-    logger.info("Model preload endpoint accessed - testing model loading capability")
+    """Load the model now so the first transcription does not pay for it"""
+    logger.info("Model preload endpoint accessed")
     try:
-        # Test load and immediately free
-        test_model = load_model_for_transcription()
-        del test_model
-        gc.collect()
+        await run_in_threadpool(load_model_for_transcription)
         
         return {
-            "message": "Model loading test successful (memory-optimized mode)",
-            "model_type": "tiny.en",
+            "message": "Model loaded and warm",
+            "model_type": model_loader.MODEL_NAME,
             "memory_optimized": True
         }
     except Exception as e:
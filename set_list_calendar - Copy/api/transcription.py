@@ -0,0 +1,116 @@
+import importlib
+import logging
+import threading
+
+from api import model_loader
+from api.audio import SAMPLE_RATE, load_audio_segment
+from api.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Precomputed log-mel for the audio array currently being transcribed on this thread
+_precomputed_mel = threading.local()
+
+
+def _install_mel_hook():
+    """Let whisper.transcribe reuse a cached log-mel instead of recomputing it.
+
+    whisper.transcribe() only accepts audio and always calls log_mel_spectrogram
+    itself, so wrap that call: when it is handed the exact array we registered
+    on this thread, return the cached features.
+    """
+    module = importlib.import_module("whisper.transcribe")
+    if getattr(module, "_uses_cached_mel", False):
+        return
+    original = module.log_mel_spectrogram
+
+    def log_mel_spectrogram(audio, n_mels=80, padding=0, device=None):
+        cached = getattr(_precomputed_mel, "value", None)
+        if cached is not None and cached[0] is audio and cached[1] == (n_mels, padding):
+            import torch
+            mel = torch.from_numpy(cached[2])
+            return mel.to(device) if device is not None else mel
+        return original(audio, n_mels, padding, device)
+
+    module.log_mel_spectrogram = log_mel_spectrogram
+    module._uses_cached_mel = True
+
+
+def _merge_chunks(chunks):
+    """Combine per-chunk Whisper results, shifting segment times by each chunk's offset"""
+    segments = []
+    for offset, result in chunks:
+        for segment in result.get("segments", []):
+            segments.append({**segment, "start": segment["start"] + offset, "end": segment["end"] + offset})
+    return {
+        "text": "".join(result["text"] for _, result in chunks),
+        "segments": segments,
+        "language": chunks[0][1].get("language", "unknown") if chunks else "unknown",
+    }
+
+
+def _cached_features(model, audio, cache, cache_key):
+    """Log-mel features for a whole file, from the cache or computed and stored"""
+    from whisper.audio import N_SAMPLES, log_mel_spectrogram
+
+    n_mels = model.dims.n_mels
+    kind = f"mel{n_mels}"
+    with span("features"):
+        mel = cache.get(cache_key, kind)
+        if mel is None:
+            # Same call whisper.transcribe makes, so the cached features are identical
+            mel = log_mel_spectrogram(audio, n_mels, padding=N_SAMPLES).numpy()
+            cache.put(cache_key, kind, mel)
+    return (n_mels, N_SAMPLES), mel
+
+
+def transcribe_file(path, model_name=None, chunk_seconds=None, cache=None, cache_key=None, **options):
+    """Transcribe an audio file with the warm model.
+
+    With chunk_seconds, the audio is decoded and transcribed one chunk at a time
+    so decoded PCM never exceeds a chunk's worth of memory. Chunks are read
+    until the audio runs out rather than up to the probed duration, which is
+    only an estimate when the container has no duration header. With an AudioCache
+    and the upload's content key, decoded PCM and log-mel features are reused
+    across retries, so changing options (language, model) skips ffmpeg and
+    feature extraction. Extra options are passed to model.transcribe.
+    """
+    with span("decode"):
+        pcm = cache.get(cache_key, "pcm") if cache is not None and cache_key else None
+
+    with model_loader.acquire_model(model_name or model_loader.MODEL_NAME) as model:
+        if not chunk_seconds:
+            if cache is None or not cache_key:
+                with span("transcribe"):
+                    return model.transcribe(path, **options)
+
+            if pcm is None:
+                with span("decode"):
+                    pcm = load_audio_segment(path)
+                    cache.put(cache_key, "pcm", pcm)
+            _install_mel_hook()
+            mel_params, mel = _cached_features(model, pcm, cache, cache_key)
+            _precomputed_mel.value = (pcm, mel_params, mel)
+            try:
+                with span("transcribe"):
+                    return model.transcribe(pcm, **options)
+            finally:
+                _precomputed_mel.value = None
+
+        chunks = []
+        offset = 0.0
+        while True:
+            with span("decode"):
+                if pcm is not None:
+                    # Slicing the memory-mapped PCM only pages in this chunk
+                    audio = pcm[int(offset * SAMPLE_RATE):int((offset + chunk_seconds) * SAMPLE_RATE)]
+                else:
+                    audio = load_audio_segment(path, offset, chunk_seconds)
+            if not len(audio):
+                break
+            with span("transcribe"):
+                chunks.append((offset, model.transcribe(audio, **options)))
+            del audio
+            offset += chunk_seconds
+    logger.info(f"Transcribed {path} in {len(chunks)} chunks of {chunk_seconds}s")
+    return _merge_chunks(chunks)
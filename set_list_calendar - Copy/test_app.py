@@ -130,5 +130,8 @@ async def transcribe_audio(file: UploadFile = File(...)):
         "filename": file.filename,
         "transcription": f"This is a mock transcription of your audio file '{file.filename}'. In production, this would be processed by OpenAI Whisper AI model.",
         "language": "en",
+        "segments": [],
+        "bits": [],
+        "set_id": None,
         "success": True
     }
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Tests for the byte-for-byte CSV rewriter and the cached geocoding stage.
+
+Run with:
+    python -m pytest test_csv_rewrite.py
+"""
+
+import pytest
+
+from csv_rewrite import rewrite_csv
+from geocode_addresses import StubGeocoder, geocode_csv
+
+HEADER = b'id,name,notes\r\n'
+
+
+def upper_name(target_id):
+    def transform(row):
+        if row['id'] == target_id:
+            row['name'] = row['name'].upper()
+    return transform
+
+
+def write(tmp_path, data, name='mics.csv'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize('newline', [b'\r\n', b'\n'])
+def test_untouched_file_is_byte_identical(tmp_path, newline):
+    data = HEADER.replace(b'\r\n', newline) + b'1,a,"quoted, with comma"' + newline + b'2,b,' + newline
+    path = write(tmp_path, data)
+
+    assert rewrite_csv(str(path), lambda row: None) == 0
+    assert path.read_bytes() == data
+
+
+@pytest.mark.parametrize('newline', [b'\r\n', b'\n'])
+def test_only_changed_row_is_reencoded(tmp_path, newline):
+    rows = [b'1,a,  odd   spacing', b'2,b,"x ""quoted"" y"', b'3,c,plain']
+    data = HEADER.replace(b'\r\n', newline) + newline.join(rows) + newline
+    path = write(tmp_path, data)
+
+    assert rewrite_csv(str(path), upper_name('2')) == 1
+    expected = rows[:]
+    expected[1] = b'2,B,"x ""quoted"" y"'
+    assert path.read_bytes() == HEADER.replace(b'\r\n', newline) + newline.join(expected) + newline
+
+
+def test_multiline_quoted_record_is_kept(tmp_path):
+    data = HEADER + b'1,a,"first line\r\nsecond line"\r\n2,b,\r\n'
+    path = write(tmp_path, data)
+
+    assert rewrite_csv(str(path), upper_name('2')) == 1
+    assert path.read_bytes() == HEADER + b'1,a,"first line\r\nsecond line"\r\n2,B,\r\n'
+
+
+def test_missing_final_newline_is_kept(tmp_path):
+    data = HEADER + b'1,x,\r\n3,z,'
+    path = write(tmp_path, data)
+
+    assert rewrite_csv(str(path), lambda row: row.update(name='Z,Z') if row['id'] == '3' else None) == 1
+    assert path.read_bytes() == HEADER + b'1,x,\r\n3,"Z,Z",'
+
+
+def test_in_place_rewrite_truncates_shorter_output(tmp_path):
+    data = HEADER + b'1,a,\r\n2,a very long name that will shrink,\r\n3,c,\r\n'
+    path = write(tmp_path, data)
+
+    assert rewrite_csv(str(path), lambda row: row.update(name='s') if row['id'] == '2' else None) == 1
+    assert path.read_bytes() == HEADER + b'1,a,\r\n2,s,\r\n3,c,\r\n'
+
+
+def test_separate_output_leaves_input_alone(tmp_path):
+    data = HEADER + b'1,a,\r\n'
+    path = write(tmp_path, data)
+    output = tmp_path / 'out.csv'
+
+    assert rewrite_csv(str(path), upper_name('1'), str(output)) == 1
+    assert path.read_bytes() == data
+    assert output.read_bytes() == HEADER + b'1,A,\r\n'
+
+
+def test_geocode_second_run_makes_no_calls(tmp_path):
+    header = 'Venue Name,Location,Geocodio Latitude,Geocodio Longitude,Geocodio Address Line 1,Geocodio City\r\n'
+    rows = ('Comedy Cellar,"117 MacDougal St, New York, NY 10012",,,,\r\n'
+            'Cellar Again,"117 Macdougal St, New York, NY 10012",,,,\r\n'
+            'Stand Up NY,"236 W 78th St, New York, NY 10024",,,,\r\n')
+    path = write(tmp_path, (header + rows).encode('utf-8'))
+    cache = tmp_path / 'cache.json'
+
+    first = StubGeocoder()
+    stats = geocode_csv(str(path), str(cache), first)
+    assert stats['geocoded'] == 2  # both spellings of MacDougal normalize to one address
+    assert stats['changed'] == 3
+    after_first = path.read_bytes()
+
+    second = StubGeocoder()
+    stats = geocode_csv(str(path), str(cache), second)
+    assert second.calls == 0
+    assert stats == {'rows': 3, 'seeded': 0, 'geocoded': 0, 'changed': 0}
+    assert path.read_bytes() == after_first